@@ -19,6 +19,7 @@
 
 
 from datetime import date
+from functools import lru_cache
 import traceback
 import gzip
 import struct
@@ -38,40 +39,72 @@ class CStats(object):
     HOURS = 24
     MINUTES = 60
     MAX_SPEED = round(HOURS * MINUTES / PER_MINUTE)
+    # single fields
+    UINT64 = struct.Struct("Q")
+    INT64 = struct.Struct("q")
+    # rows of (time, down, up) and (rx, tx)
+    STATS_ROW = struct.Struct("QQQ")
+    SPEED_ROW = struct.Struct("QQ")
 
     def __init__(self, filename):
-        try:
-            print(">>>>>>>>>> Tomato USB CSTATS <<<<<<<<<<")
-            with gzip.open(filename, 'rb') as fileHandle:
-                self.fileContent = fileHandle.read()
-            self.index = 0
-            self.size = len(self.fileContent)
-            self.records = self.size // CStats.RECORD_SIZE
-            print("File size: {0}".format(self.size))
-            print("Number of records: {0}".format(self.records))
-        except IOError:
-            sys.stderr.write("Can NOT read file: "+filename)
-            traceback.print_exc()
+        print(">>>>>>>>>> Tomato USB CSTATS <<<<<<<<<<")
+        self.filename = filename
+        self.fileContent = memoryview(b"")
+        self.index = 0
+        self.size = 0
+        self.read = 0
+        self.records = 0
 
     def dump(self):
-        for i in range(self.records):
-            print("Record Number:{0}".format(i))
-            self.dump_record()
+        # only the record being dumped is held in memory
+        with self.open_file() as fileHandle:
+            while True:
+                record = self.read_record(fileHandle)
+                self.size += len(record)
+                if len(record) < CStats.RECORD_SIZE:
+                    break
+                print("Record Number:{0}".format(self.records))
+                self.fileContent = memoryview(record)
+                self.index = 0
+                self.dump_record()
+                self.read += self.index
+                self.records += 1
+
+        print("File size: {0}".format(self.size))
+        print("Number of records: {0}".format(self.records))
 
         # check if all bytes are read
-        if self.index == self.size:
+        if self.read == self.size:
             print("All bytes read")
         else:
             print(">>> Warning!")
-            print("Read {0} bytes.".format(self.index))
+            print("Read {0} bytes.".format(self.read))
             print("Expected to read {0} bytes.".format(self.size))
-            print("Left to read {0} bytes".format(self.size - self.index))
+            print("Left to read {0} bytes".format(self.size - self.read))
+
+    def open_file(self):
+        try:
+            return gzip.open(self.filename, 'rb')
+        except IOError:
+            self.read_error()
+
+    def read_record(self, fileHandle):
+        try:
+            return fileHandle.read(CStats.RECORD_SIZE)
+        except IOError:
+            self.read_error()
+
+    def read_error(self):
+        sys.stderr.write("Can NOT read file: "+self.filename)
+        traceback.print_exc()
+        sys.exit(1)
 
     def dump_record(self):
         current = self.index
 
-        print("========== IP Address: {0} ==========".format(self.get_value(16)))
-        version = self.unpack_value("Q", 8)
+        address = self.advance(16)
+        print("========== IP Address: {0} ==========".format(bytes(self.fileContent[address:self.index])))
+        version = self.unpack_value(CStats.UINT64)
         print("Version {0}".format(version))
         if version == CStats.ID_V0:
             print("Version ID_V0")
@@ -84,20 +117,20 @@ class CStats(object):
 
         print("---------- Daily ----------")
         self.dump_stats(CStats.DAY_COUNT)
-        print("dailyp: {0}".format(self.unpack_value("q", 8)))
+        print("dailyp: {0}".format(self.unpack_value(CStats.INT64)))
 
         print("---------- Monthly ----------")
         self.dump_stats(CStats.MONTH_COUNT)
-        print("monthlyp: {0}".format(self.unpack_value("q", 8)))
+        print("monthlyp: {0}".format(self.unpack_value(CStats.INT64)))
 
-        print("utime: {0}".format(self.unpack_value("q", 8)))
-        print("tail: {0}".format(self.unpack_value("q", 8)))
+        print("utime: {0}".format(self.unpack_value(CStats.INT64)))
+        print("tail: {0}".format(self.unpack_value(CStats.INT64)))
 
         print("---------- RX/TX Speed ----------")
         self.dump_speed(CStats.MAX_SPEED)
-        print("last1: {0}".format(self.unpack_value("Q", 8)))
-        print("last2: {0}".format(self.unpack_value("Q", 8)))
-        print("sync: {0}".format(self.unpack_value("q", 8)))
+        print("last1: {0}".format(self.unpack_value(CStats.UINT64)))
+        print("last2: {0}".format(self.unpack_value(CStats.UINT64)))
+        print("sync: {0}".format(self.unpack_value(CStats.INT64)))
 
         # check if all record bytes are read
         if current + CStats.RECORD_SIZE == self.index:
@@ -109,33 +142,44 @@ class CStats(object):
             print("Left to read {0} bytes".format(self.index - current - CStats.RECORD_SIZE))
 
     def dump_speed(self, size):
-        print("Time,RX bytes,TX bytes")
-        for i in range(size):
-            rx = self.unpack_value("Q", 8)
-            tx = self.unpack_value("Q", 8)
-            time = i * CStats.PER_MINUTE
-            print("{0:02d}:{1:02d},{2},{3}".format(round(time / CStats.MINUTES), time % CStats.MINUTES, rx, tx))
+        sys.stdout.write("Time,RX bytes,TX bytes\n")
+        sys.stdout.writelines(self.format_speed(i * CStats.PER_MINUTE, rx, tx)
+                              for i, (rx, tx) in enumerate(self.iter_values(CStats.SPEED_ROW, size)))
 
     def dump_stats(self, size):
-        print("Date (yyyy/mm/dd),Down (bytes),Up (bytes)")
-        for i in range(size):
-            time = self.unpack_value("Q", 8)
-            down = self.unpack_value("Q", 8)
-            up = self.unpack_value("Q", 8)
-            print("{0},{1},{2}".format(self.get_date(time).strftime("%Y/%m/%d"), down, up))
-
-    def unpack_value(self, unpack_type, size):
-        value, = struct.unpack(unpack_type, self.get_value(size))
+        sys.stdout.write("Date (yyyy/mm/dd),Down (bytes),Up (bytes)\n")
+        sys.stdout.writelines(self.format_stats(time, down, up)
+                              for time, down, up in self.iter_values(CStats.STATS_ROW, size))
+
+    def unpack_value(self, value_struct):
+        value, = value_struct.unpack_from(self.fileContent, self.advance(value_struct.size))
         return value
 
-    def get_value(self, size):
+    def iter_values(self, row_struct, size):
+        current = self.advance(row_struct.size * size)
+        return row_struct.iter_unpack(self.fileContent[current:self.index])
+
+    def advance(self, size):
         current = self.index
         self.index += size
-        if self.index > self.size:
-            sys.stderr.write("Reached end of the buffer. Calculated:{0} Maximum:{1}".format(self.index, self.size))
+        if self.index > len(self.fileContent):
+            sys.stderr.write("Reached end of the buffer. Calculated:{0} Maximum:{1}".format(self.index, len(self.fileContent)))
             exit(3)
-        value = self.fileContent[current:self.index]
-        return value
+        return current
+
+    @staticmethod
+    def format_speed(time, rx, tx):
+        return "{0:02d}:{1:02d},{2},{3}\n".format(round(time / CStats.MINUTES), time % CStats.MINUTES, rx, tx)
+
+    @staticmethod
+    def format_stats(time, down, up):
+        return "{0},{1},{2}\n".format(CStats.format_date(time), down, up)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def format_date(time):
+        # every IP address record repeats the same daily and monthly dates
+        return CStats.get_date(time).strftime("%Y/%m/%d")
 
     @staticmethod
     def get_date(time):
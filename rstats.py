@@ -19,6 +19,7 @@
 #
 
 from datetime import date
+from functools import lru_cache
 import traceback
 import gzip
 import struct
@@ -36,61 +37,56 @@ class RStats(object):
 
     MONTH_COUNT = 25
     DAY_COUNT = 62
+    # version, daily (time, down, up) rows, dailyp, monthly rows, monthlyp
+    LAYOUT = struct.Struct("Q" + "QQQ" * DAY_COUNT + "q" + "QQQ" * MONTH_COUNT + "q")
+    # the layout covers the whole file, __init__ rejects any other size
+    assert LAYOUT.size == EXPECTED_SIZE
 
     def __init__(self, filename):
         try:
             print(">>>>>>>>>> Tomato USB RSTATS <<<<<<<<<<")
-            with gzip.open(filename, 'rb') as fileHandle:
-                self.fileContent = fileHandle.read()
+            # the compressed file is tiny, decompress it in one call
+            with open(filename, 'rb') as fileHandle:
+                self.fileContent = memoryview(gzip.decompress(fileHandle.read()))
             if len(self.fileContent) != RStats.EXPECTED_SIZE:
                 print("Unsupported File Format. Require unzip file size: {0}.".format(RStats.EXPECTED_SIZE))
                 sys.exit(2)
             print("Supported File Format Version: {0}".format(RStats.ID_V1))
-            self.index = 0
         except IOError:
             sys.stderr.write("Can NOT read file: "+filename)
             traceback.print_exc()
 
     def dump(self):
-        version = self.unpack_value("Q", 8)
+        values = RStats.LAYOUT.unpack_from(self.fileContent)
+        version = values[0]
         print("Version: {0}".format(version))
         if version != RStats.ID_V1:
             sys.stderr.write("Unknown version number: {0}\n".format(version))
             sys.exit(2)
 
+        daily_end = 1 + 3 * RStats.DAY_COUNT
         print("---------- Daily ----------")
-        self.dump_stats(RStats.DAY_COUNT)
-        print("dailyp: {0}".format(self.unpack_value("q", 8)))
+        self.dump_stats(values[1:daily_end])
+        print("dailyp: {0}".format(values[daily_end]))
 
+        monthly_end = daily_end + 1 + 3 * RStats.MONTH_COUNT
         print("---------- Monthly ----------")
-        self.dump_stats(RStats.MONTH_COUNT)
-        print("monthlyp: {0}".format(self.unpack_value("q", 8)))
-
-        # check if all bytes are read
-        if self.index == self.EXPECTED_SIZE:
-            print("All bytes read")
-        else:
-            print(">>> Warning!")
-            print("Read {0} bytes.".format(self.index))
-            print("Expected to read {0} bytes.".format(RStats.EXPECTED_SIZE))
-            print("Left to read {0} bytes".format(RStats.EXPECTED_SIZE - self.index))
-
-    def dump_stats(self, size):
-        print("Date (yyyy/mm/dd),Down (bytes),Up (bytes)")
-        for i in range(size):
-            time = self.unpack_value("Q", 8)
-            down = self.unpack_value("Q", 8)
-            up = self.unpack_value("Q", 8)
-            print("{0},{1},{2}".format(self.get_date(time).strftime("%Y/%m/%d"), down, up))
-
-    def unpack_value(self, unpack_type, size):
-        current = self.index
-        self.index += size
-        if self.index > RStats.EXPECTED_SIZE:
-            sys.stderr.write("Reached end of the buffer. {0}/{1}".format(self.index, RStats.EXPECTED_SIZE))
-            exit(3)
-        value, = struct.unpack(unpack_type, self.fileContent[current:self.index])
-        return value
+        self.dump_stats(values[daily_end + 1:monthly_end])
+        print("monthlyp: {0}".format(values[monthly_end]))
+
+    def dump_stats(self, values):
+        sys.stdout.write("Date (yyyy/mm/dd),Down (bytes),Up (bytes)\n")
+        rows = iter(values)
+        sys.stdout.writelines(self.format_stats(time, down, up) for time, down, up in zip(rows, rows, rows))
+
+    @staticmethod
+    def format_stats(time, down, up):
+        return "{0},{1},{2}\n".format(RStats.format_date(time), down, up)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def format_date(time):
+        return RStats.get_date(time).strftime("%Y/%m/%d")
 
     @staticmethod
     def get_date(time):